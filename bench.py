@@ -0,0 +1,1023 @@
+"""
+基准测试脚本
+用的
+pip install httpx
+用法: python bench.py <场景> [参数]
+     python bench.py pagination --page 10000 --page-size 10
+     python bench.py middleware --requests 5000 --concurrency 50
+     python bench.py explain --rows 50000     （默认用临时 SQLite 库，--db-url 可指定一个空的 MySQL 测试库）
+     python bench.py search --query 三体       （需要 MySQL + 全文索引）
+     python bench.py serialize --rows 10000   （纯序列化对比，不需要数据库）
+     python bench.py response-model --rows 100 （Results[T] 校验+序列化对比，不需要数据库）
+     APP_DATABASE_URL=sqlite+aiosqlite:///rt.db python bench.py roundtrips （每个接口的 SQL 语句/COMMIT 次数检查）
+     python bench.py static --requests 2000   （/file 静态文件：整文件 / 304 / Range 吞吐对比，不需要数据库）
+     python bench.py compression --rounds 50  （10/100/1000 行书籍列表：各压缩级别的传输字节数和耗时，不需要数据库）
+     python bench.py replica --requests 200   （读写分离路由检查，需要配置 APP_DATABASE_REPLICA_URLS，
+                                              本地可以用两个 SQLite 文件顶替主从库）
+     python bench.py load --books 1000 --requests 500 --output v2.json --compare v1.json
+                                              （全接口压测，默认临时 SQLite 顶替 MySQL，结果存 JSON 对比回归）
+     python bench.py routing --rounds 2000    （路由匹配耗时：逐条匹配到命中为止，以及遮挡路由改造前后对比）
+     python bench.py admission --concurrency 200 （超过连接数的突发：只靠连接池排队 vs 准入队列快速 503）
+     python bench.py coalesce --concurrency 200 （相同列表查询突发：合并前后占用的连接数和语句数）
+     python bench.py scaling --workers 8 --requests 20000
+                                              （python main.py serve 起 1/2/4.. 个 worker 的吞吐扩展，
+                                               以及 SIGTERM 时进行中的请求是否处理完）
+数据库连接沿用 main.py 里的配置，运行前先准备好数据
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+# load/coalesce 场景没指定数据库时用临时 SQLite 文件（aiosqlite），要在导入 main（读取配置）之前设置
+if sys.argv[1:2] in (["load"], ["coalesce"], ["scaling"]) and "APP_DATABASE_URL" not in os.environ:
+    os.environ["APP_DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/load.db"
+
+import httpx
+from fastapi import FastAPI, Path, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, FileResponse, Response
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import select, insert, desc, or_, text, event, func
+from starlette.routing import Match
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from main import (
+    app, AsyncSessionLocal, Base, Book, encode_cursor, TokenMiddleware, PermissionMiddleware,
+    SEARCH_COLUMNS, fulltext_phrase, search_score, EXPORT_COLUMNS, FastJSONResponse,
+    Results, BookOut, BookListResult, replica_router, static_assets,
+    CompressionMiddleware, optional_module, migrate, settings, DBAdmission, init_engines,
+)
+
+# 压测大多直接调用 app、不走 lifespan，引擎在这里一次性创建（main.py 导入时不再创建引擎）
+async_engine, replica_engines = init_engines()
+
+
+# region 工具函数
+async def timed_get(client: httpx.AsyncClient, url: str, rounds: int) -> list[float]:
+    """同一个 url 请求 rounds 次，返回每次耗时（毫秒）"""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        res = await client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+        res.raise_for_status()
+    return samples
+
+
+def report(name: str, samples: list[float]) -> dict:
+    """打印并返回 p50/p95/p99（毫秒）"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    row = {
+        "name": name,
+        "n": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+    }
+    print(f"{name:<40} n={row['n']:<5} mean={row['mean_ms']:>9}ms "
+          f"p50={row['p50_ms']:>9}ms p95={row['p95_ms']:>9}ms p99={row['p99_ms']:>9}ms")
+    return row
+
+
+def make_client(target=app) -> httpx.AsyncClient:
+    """直接在进程内调用 ASGI 应用，不经过网络"""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=target), base_url="http://bench")
+
+
+async def measure_rps(target, url: str, total: int, concurrency: int, headers: dict = None) -> float:
+    """concurrency 个协程一起打满 total 个请求，返回每秒请求数"""
+    remaining = iter(range(total))
+
+    async def worker(client):
+        for _ in remaining:
+            res = await client.get(url, headers=headers)
+            if res.is_error:  # 304 也算成功
+                res.raise_for_status()
+
+    async with make_client(target) as client:
+        await client.get(url, headers=headers)  # 预热
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+# endregion
+
+
+# region 分页：offset vs 游标
+async def bench_pagination(args):
+    # 先找到第 page 页之前的最后一条记录，生成等价的游标（不计时）
+    async with AsyncSessionLocal() as session:
+        last_id = (await session.execute(
+            select(Book.id).order_by(Book.id).offset((args.page - 1) * args.page_size - 1).limit(1)
+        )).scalar_one_or_none()
+    if last_id is None:
+        raise SystemExit(f"数据不足 {args.page} 页，请先准备数据")
+    deep_cursor = encode_cursor("id", last_id, last_id)
+
+    async with make_client() as client:
+        size = args.page_size
+        cases = {
+            "offset page=1": f"/book/page?page=1&page_size={size}",
+            f"offset page={args.page}": f"/book/page?page={args.page}&page_size={size}",
+            "cursor page=1": f"/book/page?page_size={size}&after={encode_cursor('id', 0, 0)}",
+            f"cursor page={args.page}": f"/book/page?page_size={size}&after={deep_cursor}",
+        }
+        for name, url in cases.items():
+            await client.get(url)  # 预热（顺便把总条数缓存填上）
+            report(name, await timed_get(client, url, args.rounds))
+# endregion
+
+
+# region 中间件：BaseHTTPMiddleware + print vs 纯 ASGI
+def build_legacy_app() -> FastAPI:
+    """改造前的写法：两个 @app.middleware("http") 每个请求 print 六行"""
+    legacy = FastAPI()
+
+    @legacy.middleware("http")
+    async def middleware1(request, call_next):
+        print("中间件1 start")
+        print("检查token通过")
+        res = await call_next(request)
+        print("中间件1 end")
+        return res
+
+    @legacy.middleware("http")
+    async def middleware2(request, call_next):
+        print("中间件2 start")
+        print("检查权限通过")
+        res = await call_next(request)
+        print("中间件2 end")
+        return res
+
+    @legacy.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return legacy
+
+
+def build_asgi_app() -> FastAPI:
+    """改造后的写法：main.py 里的纯 ASGI 中间件"""
+    current = FastAPI()
+
+    @current.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    current.add_middleware(PermissionMiddleware)
+    current.add_middleware(TokenMiddleware)
+    return current
+
+
+async def bench_middleware(args):
+    # print 输出重定向到 /dev/null，只比较中间件本身的开销（真实终端输出只会更慢）
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        before = await measure_rps(build_legacy_app(), "/ping", args.requests, args.concurrency)
+        after = await measure_rps(build_asgi_app(), "/ping", args.requests, args.concurrency)
+    print(f"BaseHTTPMiddleware + print: {before:>10.1f} req/s")
+    print(f"纯 ASGI + QueueHandler:      {after:>10.1f} req/s  ({after / before:.2f}x)")
+# endregion
+
+
+# region 执行计划：各接口的查询必须走索引
+def explain_cases() -> dict:
+    """{名称: (语句, 期望用到的索引名)}，语句和 main.py 里各接口的查询保持一致"""
+    table = Book.__table__
+    chunk_ids = list(range(1000, 1000 + settings.db_mutation_chunk_size))
+    return {
+        "by-single-condition (price >=)": (select(Book).where(Book.price >= 990), "ix_book_price_id"),
+        "by-multi-conditions (id >, price >)": (select(Book).where(Book.id > 100, Book.price > 990), None),
+        "order-by price": (select(Book).order_by(desc(Book.price)), "ix_book_price_id"),
+        "page keyset (price, id)": (
+            select(Book).where(Book.price > 500).order_by(Book.price, Book.id).limit(10), "ix_book_price_id"
+        ),
+        # 批量更新/删除走 run_in_chunks：按 id 顺序取一块匹配的 id，再按主键改这一块
+        "update/batch chunk select (publisher ==)": (chunk_select(Book.publisher == "出版社7"), "ix_book_publisher"),
+        "update/batch chunk (id IN, publisher ==)": (
+            table.update().where(table.c.id.in_(chunk_ids), Book.publisher == "出版社7").values(price=1), None
+        ),
+        "delete/batch chunk select (price <)": (chunk_select(Book.price < 10), None),
+        "delete/batch chunk (id IN, price <)": (table.delete().where(table.c.id.in_(chunk_ids), Book.price < 10), None),
+    }
+
+
+def chunk_select(condition):
+    """和 run_in_chunks 里取下一块 id 的语句一致"""
+    return (
+        select(Book.id, Book.publisher, Book.price)
+        .where(condition, Book.id > 1000).order_by(Book.id).limit(settings.db_mutation_chunk_size)
+    )
+
+
+async def explain_plan(conn, sql: str) -> tuple[str, bool]:
+    """返回 (执行计划文本, 是否全表扫描/额外排序)"""
+    if conn.dialect.name == "sqlite":
+        rows = (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+        plan = " | ".join(row[-1] for row in rows)
+        full_scan = any(
+            detail.startswith("SCAN") and "INDEX" not in detail or "TEMP B-TREE" in detail
+            for detail in (row[-1] for row in rows)
+        )
+        return plan, full_scan
+    # MySQL：type=ALL 是全表扫描，Extra 里有 Using filesort 是额外排序
+    result = await conn.execute(text(f"EXPLAIN {sql}"))
+    rows = result.mappings().all()
+    plan = " | ".join(f"type={row['type']} key={row['key']} extra={row['Extra']}" for row in rows)
+    full_scan = any(row["type"] == "ALL" or "filesort" in (row["Extra"] or "") for row in rows)
+    return plan, full_scan
+
+
+async def bench_explain(args):
+    db_url = args.db_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/explain.db"
+    engine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            if not (await conn.execute(select(Book.id).limit(1))).first():
+                rng = random.Random(42)
+                rows = [
+                    {"bookname": f"书{i}", "author": f"作者{i % 1000}", "price": round(rng.uniform(0, 1000), 2),
+                     "publisher": f"出版社{i % 200}"}
+                    for i in range(args.rows)
+                ]
+                await conn.execute(insert(Book), rows)
+            await conn.execute(text("ANALYZE" if conn.dialect.name == "sqlite" else "ANALYZE TABLE book"))
+
+        failed = []
+        async with engine.connect() as conn:
+            for name, (stmt, expected_index) in explain_cases().items():
+                sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+                plan, full_scan = await explain_plan(conn, sql)
+                ok = not full_scan and (expected_index is None or expected_index in plan)
+                print(f"[{'OK' if ok else 'FAIL'}] {name:<42} {plan}")
+                if not ok:
+                    failed.append(name)
+    finally:
+        await engine.dispose()
+    if failed:
+        raise SystemExit(f"{len(failed)} 个查询没有走索引: {', '.join(failed)}")
+# endregion
+
+
+# region 全文检索 vs LIKE
+async def bench_search(args):
+    async with AsyncSessionLocal() as session:
+        if session.bind.dialect.name != "mysql":
+            raise SystemExit("search 场景需要 MySQL（全文索引只在 MySQL 上创建）")
+        q = args.query
+        score = search_score(session, q).label("score")
+        statements = {
+            "LIKE '%q%' 三列": select(Book).where(
+                or_(*(column.like(f"%{q}%") for column in SEARCH_COLUMNS))
+            ).limit(args.page_size),
+            "FULLTEXT ngram 按相关度": select(Book, score).where(fulltext_phrase(q)).order_by(desc(score)).limit(args.page_size),
+        }
+        for name, stmt in statements.items():
+            samples = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                (await session.execute(stmt)).all()
+                samples.append((time.perf_counter() - start) * 1000)
+            report(name, samples)
+# endregion
+
+
+# region 序列化：ORM + jsonable_encoder vs 行元组 + orjson
+def timed(fn, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def bench_serialize(args):
+    now = datetime.datetime.now().replace(microsecond=0)
+    raw_rows = [
+        (i, f"书{i}", f"作者{i % 100}", round(i * 0.37, 2), f"出版社{i % 20}", now, now)
+        for i in range(1, args.rows + 1)
+    ]
+    books = [Book(**dict(zip(EXPORT_COLUMNS, row))) for row in raw_rows]
+
+    def orm_default():
+        # 改造前：FastAPI 对返回值做 jsonable_encoder，再交给标准库 json
+        content = jsonable_encoder({"code": 200, "message": "", "data": books})
+        JSONResponse(content).render(content)
+
+    def orm_build_and_default():
+        # 同上，但把构造 ORM 对象的开销也算进去（真实请求里 scalars().all() 要做这一步）
+        built = [Book(**dict(zip(EXPORT_COLUMNS, row))) for row in raw_rows]
+        content = jsonable_encoder({"code": 200, "message": "", "data": built})
+        JSONResponse(content).render(content)
+
+    def lite_rows():
+        # 轻量模式：行元组 -> dict -> orjson
+        data = [dict(zip(EXPORT_COLUMNS, row)) for row in raw_rows]
+        FastJSONResponse({"code": 200, "message": "", "data": data})
+
+    rounds = max(3, args.rounds // 20)
+    baseline = report(f"ORM + jsonable_encoder ({args.rows} 行)", timed(orm_default, rounds))
+    report(f"构造 ORM + jsonable_encoder ({args.rows} 行)", timed(orm_build_and_default, rounds))
+    lite = report(f"行元组 + orjson ({args.rows} 行)", timed(lite_rows, rounds))
+    print(f"轻量模式提速 {baseline['mean_ms'] / lite['mean_ms']:.1f}x（不含构造 ORM 对象）")
+# endregion
+
+
+# region 响应模型：每次请求的校验 + 序列化耗时
+async def bench_response_model(args):
+    now = datetime.datetime.now().replace(microsecond=0)
+    books = [
+        Book(id=i, bookname=f"书{i}", author=f"作者{i % 100}", price=round(i * 0.37, 2),
+             publisher=f"出版社{i % 20}", create_time=now, update_time=now)
+        for i in range(1, args.rows + 1)
+    ]
+    field = create_model_field(name="Response", type_=BookListResult, mode="serialization")
+
+    async def fastapi_pipeline(result):
+        # FastAPI 对 response_model 的处理：dump 成 dict -> 按 response_model 重新校验 -> jsonable_encoder -> json
+        content = await serialize_response(field=field, response_content=result)
+        return JSONResponse(content).body
+
+    def inline_generic():
+        # 改造前的写法：每次在路由里临时参数化 Results[...]
+        return Results[list[BookOut]](code=200, message="", data=books)
+
+    def cached_generic():
+        return BookListResult(code=200, message="", data=books)
+
+    def trusted():
+        # APP_SKIP_RESPONSE_VALIDATION=true：已校验的实例直接 dump 成 JSON
+        return BookListResult(code=200, message="", data=books).model_dump_json()
+
+    async def timed_async(fn, rounds):
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    rounds = args.rounds
+    report(f"临时参数化 Results[...] 构造 ({args.rows} 行)", timed(inline_generic, rounds))
+    report(f"缓存的 BookListResult 构造 ({args.rows} 行)", timed(cached_generic, rounds))
+
+    async def default_path():
+        await fastapi_pipeline(cached_generic())
+
+    baseline = report(f"构造 + response_model 校验序列化 ({args.rows} 行)", await timed_async(default_path, rounds))
+    bypass = report(f"构造 + 跳过校验直接 dump ({args.rows} 行)", timed(trusted, rounds))
+    print(f"跳过 response_model 校验提速 {baseline['mean_ms'] / bypass['mean_ms']:.1f}x")
+# endregion
+
+
+# region 读写分离：路由检查
+ROUTE_MARK = "路由标记"
+
+
+async def bench_replica(args):
+    """
+    每个库写一条只有自己有的标记数据（本地两个 SQLite 文件之间没有复制，正好用来区分读落在哪个库），
+    再检查：查询轮询落到从库、写过之后 sticky 时间内读主库、其他客户端不受影响
+    """
+    if not replica_engines:
+        raise SystemExit(
+            "没有配置从库，例：APP_DATABASE_URL=sqlite+aiosqlite:///primary.db "
+            "APP_DATABASE_REPLICA_URLS='[\"sqlite+aiosqlite:///replica.db\"]' python bench.py replica"
+        )
+    engines = {"primary": async_engine, **{f"replica{i}": engine for i, engine in enumerate(replica_engines)}}
+    for name, engine in engines.items():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            marker = f"{ROUTE_MARK}-{name}"
+            if not (await conn.execute(select(Book.id).where(Book.bookname == marker))).first():
+                await conn.execute(insert(Book).values(bookname=marker, author="bench", price=0, publisher="bench"))
+
+    async def read_from(client, client_id: str) -> str:
+        res = await client.get(f"/book/by-condition-single/{ROUTE_MARK}", headers={"x-client-id": client_id})
+        res.raise_for_status()
+        return res.json()["data"]["bookname"].removeprefix(f"{ROUTE_MARK}-")
+
+    failed = []
+
+    def check(name: str, ok: bool, detail) -> None:
+        print(f"[{'OK' if ok else 'FAIL'}] {name:<42} {detail}")
+        if not ok:
+            failed.append(name)
+
+    async with make_client() as client:
+        hits = {}
+        for _ in range(args.requests):
+            served = await read_from(client, "reader")
+            hits[served] = hits.get(served, 0) + 1
+        check("查询只落在从库", "primary" not in hits, hits)
+        check("从库都分到了请求", len(hits) == len(replica_engines), hits)
+
+        res = await client.post("/book/create", headers={"x-client-id": "writer"},
+                                json={"bookname": "bench", "author": "bench", "price": 1, "publisher": "bench"})
+        res.raise_for_status()
+        check("写过的客户端读主库", await read_from(client, "writer") == "primary", "writer")
+        check("其他客户端仍读从库", await read_from(client, "reader") != "primary", "reader")
+        await client.delete(f"/book/delete/{res.json()['data']['id']}", headers={"x-client-id": "writer"})
+
+        replica_router.sticky_seconds, sticky = 0, replica_router.sticky_seconds
+        replica_router.mark_write("writer")
+        check("sticky 过期后回到从库", await read_from(client, "writer") != "primary",
+              f"sticky_seconds={sticky}")
+        replica_router.sticky_seconds = sticky
+    for engine in engines.values():
+        await engine.dispose()
+    if failed:
+        raise SystemExit(f"{len(failed)} 项路由检查失败: {', '.join(failed)}")
+# endregion
+
+
+# region 事务：每个接口的数据库往返次数
+def roundtrip_cases(book_id: int, dialect: str) -> dict:
+    """用例名 -> (方法, url, 请求体, 期望语句数, 期望 COMMIT 数)，按顺序执行（后面的用例依赖前面写入的数据）"""
+    body = {"bookname": "往返", "author": "bench", "price": 9.9, "publisher": "往返出版社"}
+    # SQLite 的 INSERT ... RETURNING 要按参数顺序取回 id 时只能逐行执行，MySQL 是一条多行 INSERT
+    batch_statements = 3 if dialect == "sqlite" else 1
+    return {
+        "新增单条": ("POST", "/book/create", body, 1, 1),
+        "批量新增 3 条": ("POST", "/book/create/batch", [body] * 3, batch_statements, 1),
+        "单条更新": ("PUT", f"/book/update/{book_id}", {"price": 19.9}, 2, 1),
+        "主键查询（未命中缓存）": ("GET", f"/book/by-id/{book_id}", None, 1, 0),
+        "主键查询（命中缓存）": ("GET", f"/book/by-id/{book_id}", None, 0, 0),
+        "条件查询单条": ("GET", "/book/by-condition-single/往返", None, 1, 0),
+        "单条件查询": ("GET", "/book/by-single-condition/1", None, 1, 0),
+        "分页查询": ("GET", "/book/page?page_size=5&with_total=false", None, 1, 0),
+        "单条删除": ("DELETE", f"/book/delete/{book_id}", None, 2, 1),
+    }
+
+
+async def bench_roundtrips(args):
+    """统计每个请求发出的 SQL 语句数和 COMMIT 数，与约定不一致就失败（读不提交，写只提交一次、不 refresh）"""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    counts = {"statements": 0, "commits": 0}
+
+    def on_execute(*_):
+        counts["statements"] += 1
+
+    def on_commit(*_):
+        counts["commits"] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(async_engine.sync_engine, "commit", on_commit)
+    failed = []
+    try:
+        async with make_client() as client:
+            res = await client.post("/book/create", json={"bookname": "往返", "author": "bench", "price": 1,
+                                                          "publisher": "往返出版社"})
+            book_id = res.json()["data"]["id"]
+            for name, (method, url, body, statements, commits) in roundtrip_cases(book_id, async_engine.dialect.name).items():
+                counts.update(statements=0, commits=0)
+                res = await client.request(method, url, json=body)
+                ok = res.status_code == 200 and (counts["statements"], counts["commits"]) == (statements, commits)
+                print(f"[{'OK' if ok else 'FAIL'}] {name:<24} 语句 {counts['statements']}（期望 {statements}）"
+                      f" COMMIT {counts['commits']}（期望 {commits}）")
+                if not ok:
+                    failed.append(name)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", on_execute)
+        event.remove(async_engine.sync_engine, "commit", on_commit)
+        await async_engine.dispose()
+    if failed:
+        raise SystemExit(f"{len(failed)} 个接口的数据库往返次数不符合约定: {', '.join(failed)}")
+# endregion
+
+
+# region 静态文件：每次 FileResponse vs 元数据/内容缓存 + 304 + Range
+def build_file_app() -> FastAPI:
+    """改造前的 /file：每个请求都 stat + 从磁盘读一遍"""
+    legacy = FastAPI()
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gojo-jujutsu.jpg")
+
+    @legacy.get("/file")
+    async def get_file():
+        return FileResponse(path)
+
+    return legacy
+
+
+async def bench_static(args):
+    await static_assets.load_all()
+    asset = await static_assets.get("gojo-jujutsu.jpg")
+    cases = {
+        "整个文件": None,
+        "Range 前 64KB": {"range": "bytes=0-65535"},
+        "If-None-Match（304）": {"if-none-match": asset.etag},
+    }
+    legacy = build_file_app()
+    for name, headers in cases.items():
+        before = await measure_rps(legacy, "/file", args.requests, args.concurrency, headers)
+        after = await measure_rps(app, "/file", args.requests, args.concurrency, headers)
+        print(f"{name:<20} FileResponse {before:>9.0f} req/s   静态资源缓存 {after:>9.0f} req/s   {after / before:.1f}x")
+# endregion
+
+
+# region 响应压缩：传输字节数 vs 耗时
+def build_list_app(payloads: dict, **options) -> FastAPI:
+    """/rows/{n} 直接返回预先渲染好的 n 行书籍列表 JSON，只测压缩本身"""
+    target = FastAPI()
+    target.add_middleware(CompressionMiddleware, **options)
+
+    @target.get("/rows/{n}")
+    async def rows(n: int):
+        return Response(payloads[n], media_type="application/json")
+
+    return target
+
+
+async def bench_compression(args):
+    now = datetime.datetime.now().replace(microsecond=0)
+    payloads = {}
+    for n in (10, 100, 1000):
+        data = [
+            dict(zip(EXPORT_COLUMNS, (i, f"书{i}", f"作者{i % 100}", round(i * 0.37, 2), f"出版社{i % 20}", now, now)))
+            for i in range(1, n + 1)
+        ]
+        payloads[n] = FastJSONResponse({"code": 200, "message": f"查询成功，共 {n} 本", "data": data}).body
+
+    variants = [("identity", "identity", {})]
+    variants += [(f"gzip level={level}", "gzip", {"gzip_level": level}) for level in (1, 6, 9)]
+    if optional_module("brotli") is not None:
+        variants += [(f"br quality={quality}", "br", {"brotli_quality": quality}) for quality in (1, 4, 11)]
+    for n, payload in payloads.items():
+        for name, accept, options in variants:
+            async with make_client(build_list_app(payloads, **options)) as client:
+                headers = {"accept-encoding": accept}
+                wire = (await client.get(f"/rows/{n}", headers=headers)).num_bytes_downloaded
+                samples = []
+                for _ in range(args.rounds):
+                    start = time.perf_counter()
+                    await client.get(f"/rows/{n}", headers=headers)
+                    samples.append((time.perf_counter() - start) * 1000)
+            report(f"{n:>4} 行 {name}", samples)
+            print(f"{'':<40} 传输 {wire} 字节（原始 {len(payload)}，{wire / len(payload):.1%}）")
+# endregion
+
+
+# region 全接口压测：RPS + 延迟分位数，结果存 JSON 对比回归
+def load_cases(books: int) -> dict:
+    """
+    用例名 -> (方法, 生成 url 的函数, 生成请求体的函数)；url/请求体每次随机，避免只打同一条数据
+    覆盖 main.py 的全部业务路由（/exception401 随机返回 401 的演示接口、/docs 等框架自带页面除外），
+    删除放在最后：前面的用例跑完再删，不影响其他用例的数据
+    """
+    def body(rng):
+        return {"bookname": f"压测{rng.randrange(books)}", "author": "load", "price": round(rng.uniform(1, 1000), 2),
+                "publisher": f"出版社{rng.randrange(20)}"}
+
+    pick = lambda rng: rng.randint(1, books)
+    return {
+        "path-variable": ("GET", lambda rng: f"/path-variable/{rng.randint(1, 101)}", None),
+        "path-variable name": ("GET", lambda rng: f"/path-variable/name{rng.randint(1, 1000)}", None),
+        "news": ("GET", lambda rng: f"/news/{rng.randint(1, 1000)}", None),
+        "news-list": ("GET", lambda rng: f"/news-list?skip={rng.randint(0, 100)}&limit=10", None),
+        "request-param": ("GET", lambda rng: f"/request-param?skip={rng.randint(0, 100)}&limit=10", None),
+        "request-body": ("POST", lambda rng: "/request-body", lambda rng: {"name": "张三", "age": rng.randint(4, 99)}),
+        "html": ("GET", lambda rng: "/html", None),
+        "file": ("GET", lambda rng: "/file", None),
+        "metrics": ("GET", lambda rng: "/metrics", None),
+        "cache/stats": ("GET", lambda rng: "/cache/stats", None),
+        "book/stats": ("GET", lambda rng: "/book/stats", None),
+        "book/stats/publishers": ("GET", lambda rng: f"/book/stats/publishers?publisher=出版社{rng.randrange(20)}", None),
+        "book/stats/reconcile": ("POST", lambda rng: "/book/stats/reconcile", None),
+        # 随机任务 id：测的是查进度这条路径本身（任务不存在返回 code=404）
+        "book/jobs": ("GET", lambda rng: f"/book/jobs/{rng.getrandbits(128):032x}", None),
+        "book/by-id": ("GET", lambda rng: f"/book/by-id/{pick(rng)}", None),
+        "book/books": ("GET", lambda rng: f"/book/books/{pick(rng)}", None),
+        "book/all": ("GET", lambda rng: "/book/all", None),
+        "book/all lite": ("GET", lambda rng: "/book/all?lite=true", None),
+        "book/by-single-condition": ("GET", lambda rng: f"/book/by-single-condition/{rng.randint(900, 999)}", None),
+        "book/by-multi-conditions": ("GET", lambda rng: f"/book/by-multi-conditions/{pick(rng)}/900", None),
+        "book/by-condition-single": ("GET", lambda rng: f"/book/by-condition-single/书{pick(rng)}", None),
+        "book/order-by": ("GET", lambda rng: "/book/order-by/price?fields=id,price", None),
+        "book/page offset": ("GET", lambda rng: f"/book/page?page={rng.randint(1, max(1, books // 10))}", None),
+        "book/page cursor": ("GET", lambda rng: f"/book/page?after={encode_cursor('id', pick(rng), pick(rng))}"
+                                                f"&with_total=false", None),
+        "book/search": ("GET", lambda rng: f"/book/search?q=作者{rng.randrange(100)}", None),
+        "book/create": ("POST", lambda rng: "/book/create", body),
+        "book/create/batch": ("POST", lambda rng: "/book/create/batch?echo=false", lambda rng: [body(rng) for _ in range(100)]),
+        "book/update": ("PUT", lambda rng: f"/book/update/{pick(rng)}", lambda rng: {"price": round(rng.uniform(1, 1000), 2)}),
+        "book/update/batch": ("PUT", lambda rng: f"/book/update/batch?publisher=出版社{rng.randrange(20)}"
+                                                 f"&new_price={round(rng.uniform(1, 1000), 2)}", None),
+        # 已经删掉的 id 返回 code=404，照样走完查询路径
+        "book/delete": ("DELETE", lambda rng: f"/book/delete/{pick(rng)}", None),
+        # 价格下限取得很低，每次只删掉零星几本
+        "book/delete/batch": ("DELETE", lambda rng: f"/book/delete/batch?min_price={round(rng.uniform(1, 2), 2)}", None),
+    }
+
+
+async def seed_books(books: int) -> None:
+    """建表并写入 books 条数据（已经有足够数据就跳过）"""
+    await migrate()
+    async with async_engine.begin() as conn:
+        existing = (await conn.execute(select(func.count(Book.id)))).scalar_one()
+        rng = random.Random(42)
+        rows = [
+            {"bookname": f"书{i}", "author": f"作者{i % 100}", "price": round(rng.uniform(1, 1000), 2),
+             "publisher": f"出版社{i % 20}"}
+            for i in range(existing, books)
+        ]
+        for start in range(0, len(rows), 1000):
+            await conn.execute(insert(Book), rows[start:start + 1000])
+
+
+async def run_load(client: httpx.AsyncClient, case, total: int, concurrency: int, seed: int) -> tuple[float, list[float], int]:
+    """concurrency 个协程跑完 total 个请求，返回 (RPS, 每个请求耗时, 失败数)"""
+    method, make_url, make_body = case
+    rng = random.Random(seed)
+    requests = [(make_url(rng), make_body(rng) if make_body else None) for _ in range(total)]
+    remaining = iter(requests)
+    samples, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for url, body in remaining:
+            start = time.perf_counter()
+            try:
+                res = await client.request(method, url, json=body)
+                errors += res.is_error
+            except Exception:  # 进程内调用时应用里的异常会直接抛出来
+                errors += 1
+            samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start), samples, errors
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """RPS 下降或 p95 上升超过 tolerance 的用例"""
+    regressions = []
+    for name, row in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if row["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: RPS {base['rps']} -> {row['rps']}")
+        if row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms")
+    return regressions
+
+
+async def bench_load(args):
+    await seed_books(args.books)
+    results = {}
+    try:
+        async with make_client() as client:
+            for index, (name, case) in enumerate(load_cases(args.books).items()):
+                if args.only and args.only not in name:
+                    continue
+                concurrency = args.concurrency
+                if case[0] != "GET" and async_engine.dialect.name == "sqlite":
+                    concurrency = 1  # SQLite 同一时间只能有一个写事务，并发写只会互相报 database is locked
+                await run_load(client, case, min(concurrency, args.requests), concurrency, seed=-index)  # 预热
+                rps, samples, errors = await run_load(client, case, args.requests, concurrency, seed=index)
+                row = report(name, samples)
+                row.update(rps=round(rps, 1), errors=errors)
+                print(f"{'':<40} {rps:>9.1f} req/s  失败 {errors}")
+                results[name] = row
+    finally:
+        await async_engine.dispose()
+
+    output = {
+        "meta": {
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": async_engine.dialect.name,
+            "books": args.books,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(output, file, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}")
+    failed = [name for name, row in results.items() if row["errors"]]
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare_results(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[回归] {line}")
+        if regressions:
+            raise SystemExit(f"{len(regressions)} 项指标超出允许波动 {args.tolerance:.0%}")
+    if failed:
+        raise SystemExit(f"{len(failed)} 个接口有失败请求: {', '.join(failed)}")
+# endregion
+
+
+# region 请求合并：相同查询突发时占用的连接数
+async def bench_coalesce(args):
+    await seed_books(args.books)
+    counts = {"checked_out": 0, "peak": 0, "statements": 0}
+
+    def on_checkout(*_):
+        counts["checked_out"] += 1
+        counts["peak"] = max(counts["peak"], counts["checked_out"])
+
+    def on_checkin(*_):
+        counts["checked_out"] -= 1
+
+    def on_execute(*_):
+        counts["statements"] += 1
+
+    event.listen(async_engine.sync_engine.pool, "checkout", on_checkout)
+    event.listen(async_engine.sync_engine.pool, "checkin", on_checkin)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    urls = ["/book/order-by/price", "/book/by-single-condition/900?fields=id,bookname,price"]
+    try:
+        async with make_client() as client:
+            for url in urls:
+                for coalesce in (False, True):
+                    settings.coalesce_reads = coalesce
+                    counts.update(peak=0, statements=0)
+                    start = time.perf_counter()
+                    responses = await asyncio.gather(*(client.get(url) for _ in range(args.concurrency)))
+                    elapsed = (time.perf_counter() - start) * 1000
+                    errors = sum(res.is_error for res in responses)
+                    print(f"{url:<56} 合并={'开' if coalesce else '关'}  {args.concurrency} 个并发请求  "
+                          f"语句 {counts['statements']:>4}  最多同时占用连接 {counts['peak']:>3}  "
+                          f"总耗时 {elapsed:8.1f}ms  失败 {errors}")
+    finally:
+        settings.coalesce_reads = True
+        await async_engine.dispose()
+# endregion
+
+
+# region 路由：匹配耗时 + 遮挡路由改造前后
+def resolve(routes, method: str, path: str):
+    """和 Starlette Router 一样按顺序逐条匹配，返回 (命中的路由, 试过的路由数)"""
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    partial = None
+    for index, route in enumerate(routes, 1):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route, index
+        if match == Match.PARTIAL and partial is None:
+            partial = route
+    return partial, len(routes)
+
+
+def build_path_variable_app(typed: bool) -> FastAPI:
+    """/path-variable/{id} + /path-variable/{name}：typed=False 是改造前（非数字走到 int 路由返回 422）"""
+    target = FastAPI()
+
+    @target.get("/path-variable/{id:int}" if typed else "/path-variable/{id}")
+    async def by_id(id: int = Path(..., gt=0, le=101)):
+        return {"id": id}
+
+    @target.get("/path-variable/{name}")
+    async def by_name(name: str = Path(..., min_length=3)):
+        return {"name": name}
+
+    return target
+
+
+async def bench_routing(args):
+    cases = [
+        ("GET", "/path-variable/5"), ("GET", "/path-variable/abc"), ("GET", "/book/by-id/5"),
+        ("GET", "/book/page"), ("PUT", "/book/update/batch"), ("DELETE", "/book/delete/5"), ("GET", "/not-found"),
+    ]
+    routes = app.router.routes
+    for method, path in cases:
+        route, tried = resolve(routes, method, path)
+        samples = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            resolve(routes, method, path)
+            samples.append((time.perf_counter() - start) * 1000)
+        report(f"{method} {path}", samples)
+        print(f"{'':<40} 命中 {getattr(route, 'path', None)}，依次试了 {tried}/{len(routes)} 条路由")
+
+    for typed in (False, True):
+        async with make_client(build_path_variable_app(typed)) as client:
+            status = (await client.get("/path-variable/abc")).status_code
+            samples = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                await client.get("/path-variable/abc")
+                samples.append((time.perf_counter() - start) * 1000)
+        report(f"/path-variable/abc {'{id:int}' if typed else '{id}'} -> {status}", samples)
+# endregion
+
+
+# region 准入控制：突发流量下的延迟和 503
+def build_admission_app(admission: Optional[DBAdmission], connections: int, query_ms: float) -> FastAPI:
+    """每个请求占用一个“连接” query_ms 毫秒；admission=None 时只有连接池式的无界排队"""
+    target = FastAPI()
+    pool = asyncio.Semaphore(connections)
+
+    async def get_connection():
+        async with (admission.slot() if admission else contextlib.nullcontext()), pool:
+            yield
+
+    @target.get("/query", dependencies=[Depends(get_connection)])
+    async def query():
+        await asyncio.sleep(query_ms / 1000)
+        return {"code": 200}
+
+    return target
+
+
+async def bench_admission(args):
+    connections, query_ms = 25, 20  # 和默认连接池一样 10 + 15 个连接
+    variants = {
+        "只有连接池排队": None,
+        "准入队列 50 / 超时 0.2s": DBAdmission("bench", limit=connections, queue_size=50, timeout=0.2),
+    }
+    for name, admission in variants.items():
+        async with make_client(build_admission_app(admission, connections, query_ms)) as client:
+            async def one():
+                start = time.perf_counter()
+                res = await client.get("/query")
+                return res.status_code, (time.perf_counter() - start) * 1000
+
+            results = await asyncio.gather(*(one() for _ in range(args.concurrency)))
+        ok = [ms for status, ms in results if status == 200]
+        shed = [ms for status, ms in results if status == 503]
+        print(f"{name}：{args.concurrency} 个并发请求，成功 {len(ok)}，503 {len(shed)}")
+        report("  成功请求", ok)
+        if shed:
+            report("  被拒绝请求", shed)
+# endregion
+
+
+# region 多进程：吞吐随 worker 数的扩展 + SIGTERM 排空
+SCALING_CASES = {
+    "path-variable（不查库）": "/path-variable/1",
+    "book/by-id（进程内缓存）": "/book/by-id/1",
+    "book/page cursor（查库）": "/book/page?page_size=10&with_total=false",
+}
+
+
+def client_process(base_url: str, path: str, total: int, concurrency: int) -> tuple[int, int, float]:
+    """压测客户端进程（单进程的 httpx 客户端本身就会成为瓶颈），返回 (成功数, 失败数, 耗时秒)"""
+    async def run():
+        remaining = iter(range(total))
+        counts = [0, 0]
+
+        async def worker(client):
+            for _ in remaining:
+                try:
+                    res = await client.get(path)
+                    counts[res.is_error] += 1
+                except httpx.HTTPError:
+                    counts[1] += 1
+
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            return counts[0], counts[1], time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """后台执行 python main.py serve（子进程继承 APP_* 环境变量，和本进程用同一个库）"""
+    return subprocess.Popen(
+        [sys.executable, "main.py", "serve", "--workers", str(workers), "--port", str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise SystemExit(f"main.py serve 启动失败，退出码 {server.returncode}")
+            try:
+                if (await client.get("/path-variable/1")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise SystemExit(f"main.py serve {timeout} 秒内没有就绪")
+
+
+async def measure_server_rps(pool: ProcessPoolExecutor, clients: int, base_url: str, path: str,
+                             total: int, concurrency: int) -> tuple[float, int]:
+    """clients 个客户端进程一起压，返回 (总吞吐, 失败数)"""
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(pool, client_process, base_url, path, total // clients, max(1, concurrency // clients))
+        for _ in range(clients)
+    ))
+    ok = sum(r[0] for r in results)
+    return ok / max(r[2] for r in results), sum(r[1] for r in results)
+
+
+async def drain_check(base_url: str, server: subprocess.Popen, concurrency: int) -> None:
+    """并发请求进行中发 SIGTERM：已经在处理的请求应该正常返回，之后的新连接被拒绝，进程自己退出"""
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        tasks = [asyncio.create_task(client.get("/book/all")) for _ in range(concurrency)]
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    ok = sum(isinstance(r, httpx.Response) and r.status_code == 200 for r in results)
+    refused = sum(isinstance(r, httpx.ConnectError) for r in results)
+    await asyncio.to_thread(server.wait, settings.serve_graceful_timeout + 10)
+    print(f"SIGTERM 排空：{concurrency} 个并发请求，正常返回 {ok}，连接被拒 {refused}，"
+          f"中断 {concurrency - ok - refused}；进程 {(time.perf_counter() - start) * 1000:.0f}ms 后退出，"
+          f"退出码 {server.returncode}")
+
+
+async def bench_scaling(args):
+    await seed_books(args.books)
+    await async_engine.dispose()  # 库交给 serve 子进程用，本进程不再占连接
+    max_workers = args.workers or os.cpu_count() or 1
+    counts = sorted({1 << i for i in range(max_workers.bit_length()) if 1 << i <= max_workers} | {max_workers})
+    clients = args.clients or os.cpu_count() or 1
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"CPU 核数 {os.cpu_count()}，客户端进程 {clients}，每个用例 {args.requests} 个请求，并发 {args.concurrency}")
+    baseline = {}
+    with ProcessPoolExecutor(clients, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for workers in counts:
+            server = start_server(workers, args.port)
+            try:
+                await wait_ready(base_url, server)
+                for name, path in SCALING_CASES.items():
+                    await measure_server_rps(pool, clients, base_url, path, min(args.requests, 1000), args.concurrency)  # 预热
+                    rps, errors = await measure_server_rps(pool, clients, base_url, path, args.requests, args.concurrency)
+                    baseline.setdefault(name, rps)
+                    print(f"workers={workers:<3} {name:<28} {rps:>9.1f} req/s  x{rps / baseline[name]:.2f}  失败 {errors}")
+                if workers == counts[-1]:
+                    await drain_check(base_url, server, args.concurrency)
+            finally:
+                if server.poll() is None:
+                    server.send_signal(signal.SIGTERM)
+                    await asyncio.to_thread(server.wait)
+# endregion
+
+
+SCENARIOS = {
+    "pagination": bench_pagination,
+    "middleware": bench_middleware,
+    "explain": bench_explain,
+    "search": bench_search,
+    "serialize": bench_serialize,
+    "response-model": bench_response_model,
+    "replica": bench_replica,
+    "static": bench_static,
+    "compression": bench_compression,
+    "load": bench_load,
+    "coalesce": bench_coalesce,
+    "admission": bench_admission,
+    "routing": bench_routing,
+    "roundtrips": bench_roundtrips,
+    "scaling": bench_scaling,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fastapi-demo 基准测试")
+    parser.add_argument("scenario", choices=SCENARIOS)
+    parser.add_argument("--rounds", type=int, default=200, help="每个用例请求次数")
+    parser.add_argument("--page", type=int, default=10_000, help="pagination: 深翻页页码")
+    parser.add_argument("--page-size", type=int, default=10, help="pagination: 每页条数")
+    parser.add_argument("--requests", type=int, default=5000, help="吞吐类场景的总请求数")
+    parser.add_argument("--concurrency", type=int, default=50, help="吞吐类场景的并发数")
+    parser.add_argument("--rows", type=int, default=50_000, help="explain/serialize/response-model: 造数据的行数")
+    parser.add_argument("--db-url", default=None, help="explain: 数据库连接串，默认临时 SQLite")
+    parser.add_argument("--query", default="三体", help="search: 关键词")
+    parser.add_argument("--books", type=int, default=1000, help="load: 预先写入的书籍条数")
+    parser.add_argument("--only", default=None, help="load: 只跑名字包含该字符串的用例")
+    parser.add_argument("--output", default=None, help="load: 结果写入的 JSON 文件")
+    parser.add_argument("--compare", default=None, help="load: 对比的基线 JSON 文件（上一版本 --output 的结果）")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="load: 允许的波动比例，超出算回归")
+    parser.add_argument("--workers", type=int, default=None, help="scaling: 最多起多少个 worker，默认 CPU 核数")
+    parser.add_argument("--clients", type=int, default=None, help="scaling: 压测客户端进程数，默认 CPU 核数")
+    parser.add_argument("--port", type=int, default=8765, help="scaling: main.py serve 监听的端口")
+    args = parser.parse_args()
+    asyncio.run(SCENARIOS[args.scenario](args))
+
+
+if __name__ == "__main__":
+    main()